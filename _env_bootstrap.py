@@ -0,0 +1,13 @@
+"""
+Environment bootstrap for Groq FastAPI Chatbot.
+Loads the .env file once per process, no matter how many modules ask for it.
+"""
+
+from functools import lru_cache
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=1)
+def ensure_env_loaded() -> None:
+    """Load environment variables from the .env file on first call only."""
+    load_dotenv()
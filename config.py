@@ -4,44 +4,81 @@ Handles environment variables and application settings.
 """
 
 import os
-from typing import Optional
-from pydantic import BaseSettings
-from dotenv import load_dotenv
+import sys
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Final, Optional
+
+from _env_bootstrap import ensure_env_loaded
 
 # Load environment variables from .env file
-load_dotenv()
+ensure_env_loaded()
 
 
-class Settings(BaseSettings):
+@dataclass(frozen=True, slots=True)
+class Settings:
     """Application settings loaded from environment variables."""
     
     # Groq API Configuration
-    groq_api_key: str = os.getenv("GROQ_API_KEY", "")
-    default_model: str = os.getenv("GROQ_DEFAULT_MODEL", "llama-3.1-8b-instant")
+    groq_api_key: str = ""
+    default_model: str = "llama-3.1-8b-instant"
     
     # Server Configuration
-    host: str = os.getenv("HOST", "0.0.0.0")
-    port: int = int(os.getenv("PORT", "8000"))
-    debug: bool = os.getenv("DEBUG", "False").lower() == "true"
+    host: str = "0.0.0.0"
+    port: int = 8000
+    debug: bool = False
     
     # API Configuration
-    max_message_length: int = int(os.getenv("MAX_MESSAGE_LENGTH", "4000"))
-    default_max_tokens: int = int(os.getenv("DEFAULT_MAX_TOKENS", "1024"))
-    default_temperature: float = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
+    max_message_length: int = 4000
+    default_max_tokens: int = 1024
+    default_temperature: float = 0.7
     
     # CORS Configuration
-    allowed_origins: list = os.getenv("ALLOWED_ORIGINS", "*").split(",")
+    allowed_origins: tuple = ("*",)
     
     # Logging Configuration
-    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_level: str = "INFO"
+    
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Build settings from the current environment.
+        
+        Returns:
+            Settings: Settings populated from environment variables
+        """
+        getenv = os.environ.get
+        return cls(
+            groq_api_key=getenv("GROQ_API_KEY", ""),
+            default_model=getenv("GROQ_DEFAULT_MODEL", "llama-3.1-8b-instant"),
+            host=getenv("HOST", "0.0.0.0"),
+            port=int(getenv("PORT", "8000")),
+            debug=getenv("DEBUG", "False").lower() == "true",
+            max_message_length=int(getenv("MAX_MESSAGE_LENGTH", "4000")),
+            default_max_tokens=int(getenv("DEFAULT_MAX_TOKENS", "1024")),
+            default_temperature=float(getenv("DEFAULT_TEMPERATURE", "0.7")),
+            allowed_origins=tuple(getenv("ALLOWED_ORIGINS", "*").split(",")),
+            log_level=getenv("LOG_LEVEL", "INFO"),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, loading them on first access.
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    Returns:
+        Settings: Cached application settings
+    """
+    return Settings.from_env()
 
 
-# Global settings instance
-settings = Settings()
+# Settings checks as (predicate, error message) pairs, run in order
+_CHECKS: Final[tuple] = (
+    (lambda s: bool(s.groq_api_key), "GROQ_API_KEY is not set!"),
+    (lambda s: 1 <= s.port <= 65535, "Invalid port number: {s.port}"),
+    (lambda s: 0.0 <= s.default_temperature <= 2.0, "Invalid temperature: {s.default_temperature}"),
+)
 
 
 def validate_settings() -> bool:
@@ -51,56 +88,68 @@ def validate_settings() -> bool:
     Returns:
         bool: True if all settings are valid, False otherwise
     """
-    if not settings.groq_api_key:
-        print("ERROR: GROQ_API_KEY is not set!")
-        return False
-    
-    if settings.port < 1 or settings.port > 65535:
-        print(f"ERROR: Invalid port number: {settings.port}")
-        return False
+    settings = get_settings()
     
-    if settings.default_temperature < 0.0 or settings.default_temperature > 2.0:
-        print(f"ERROR: Invalid temperature: {settings.default_temperature}")
-        return False
+    for check, message in _CHECKS:
+        if not check(settings):
+            print(f"ERROR: {message.format(s=settings)}", file=sys.stderr)
+            return False
     
     return True
 
 
-def get_groq_models() -> list:
+# Available Groq models, built once at import
+_GROQ_MODELS: Final[tuple] = (
+    {
+        "id": "llama-3.1-8b-instant",
+        "name": "LLaMA3 8B",
+        "description": "Fast and efficient model for general conversations",
+        "max_tokens": 8192,
+        "recommended": True
+    },
+    {
+        "id": "llama3-70b-8192",
+        "name": "LLaMA3 70B",
+        "description": "More powerful model for complex tasks",
+        "max_tokens": 8192,
+        "recommended": False
+    },
+    {
+        "id": "mixtral-8x7b-32768",
+        "name": "Mixtral 8x7B",
+        "description": "High-performance mixture of experts model",
+        "max_tokens": 32768,
+        "recommended": True
+    },
+    {
+        "id": "gemma-7b-it",
+        "name": "Gemma 7B",
+        "description": "Google's Gemma model for instruction following",
+        "max_tokens": 8192,
+        "recommended": False
+    }
+)
+
+
+def get_groq_models() -> tuple:
     """
     Get list of available Groq models.
     
     Returns:
-        list: List of available model configurations
+        tuple: Available model configurations
     """
-    return [
-        {
-            "id": "llama-3.1-8b-instant",
-            "name": "LLaMA3 8B",
-            "description": "Fast and efficient model for general conversations",
-            "max_tokens": 8192,
-            "recommended": True
-        },
-        {
-            "id": "llama-3.1-8b-instant", 
-            "name": "LLaMA3 70B",
-            "description": "More powerful model for complex tasks",
-            "max_tokens": 8192,
-            "recommended": False
-        },
-        {
-            "id": "mixtral-8x7b-32768",
-            "name": "Mixtral 8x7B",
-            "description": "High-performance mixture of experts model",
-            "max_tokens": 32768,
-            "recommended": True
-        },
-        {
-            "id": "gemma-7b-it",
-            "name": "Gemma 7B",
-            "description": "Google's Gemma model for instruction following",
-            "max_tokens": 8192,
-            "recommended": False
-        }
-    ]
+    return _GROQ_MODELS
 
+
+@lru_cache(maxsize=1)
+def get_valid_model_ids() -> frozenset:
+    """
+    Get the model IDs accepted by the API.
+    
+    Includes every catalogue model plus the configured default model,
+    which may not be in the catalogue.
+    
+    Returns:
+        frozenset: Accepted model IDs
+    """
+    return frozenset(model["id"] for model in _GROQ_MODELS) | {get_settings().default_model}
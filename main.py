@@ -4,19 +4,29 @@ A complete backend API for AI chatbot using FastAPI and Groq's LLaMA3 model.
 """
 
 import os
+import re
 import logging
 from typing import Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, status
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from groq import Groq
-from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from groq import (
+    APIConnectionError,
+    AsyncGroq,
+    AuthenticationError,
+    NotFoundError,
+    RateLimitError,
+)
+
+from _env_bootstrap import ensure_env_loaded
+from config import Settings, get_groq_models, get_settings, get_valid_model_ids
 
 # Load environment variables
-load_dotenv()
+ensure_env_loaded()
 
 # Configure logging
 logging.basicConfig(
@@ -25,15 +35,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global Groq client
-groq_client: Optional[Groq] = None
+# System message sent ahead of every user message
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": "You are a helpful AI assistant. Provide clear, concise, and helpful responses."
+}
+
+# Any SSE line terminator; each piece must go on its own data line
+_SSE_LINE_BREAK_RE = re.compile(r"\r\n|\r|\n")
+
+# Model IDs accepted by the chat endpoint
+_VALID_MODELS = get_valid_model_ids()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events."""
-    global groq_client
-    
     # Startup
     logger.info("Starting Groq FastAPI Chatbot...")
     
@@ -43,18 +60,27 @@ async def lifespan(app: FastAPI):
         logger.error("GROQ_API_KEY environment variable is not set!")
         raise RuntimeError("GROQ_API_KEY is required")
     
+    # Shared HTTP/2 connection pool so TLS sessions are reused across requests
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200)
+    )
+    
     try:
-        groq_client = Groq(api_key=api_key)
+        app.state.groq_client = AsyncGroq(api_key=api_key, http_client=http_client)
         logger.info("Groq client initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize Groq client: {e}")
+        logger.error("Failed to initialize Groq client: %s", e)
+        await http_client.aclose()
         raise RuntimeError(f"Failed to initialize Groq client: {e}")
     
     yield
     
     # Shutdown
     logger.info("Shutting down Groq FastAPI Chatbot...")
-    groq_client = None
+    app.state.groq_client = None
+    await http_client.aclose()
 
 
 # Initialize FastAPI app
@@ -71,42 +97,82 @@ app = FastAPI(
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, specify your frontend domains
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_credentials=False,  # Credentials cannot be combined with a wildcard origin
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
 )
 
 
+def get_groq_client(request: Request) -> AsyncGroq:
+    """
+    Get the Groq client created at startup.
+    
+    Args:
+        request: Incoming request, used to reach the application state
+        
+    Returns:
+        AsyncGroq: Shared Groq client
+        
+    Raises:
+        HTTPException: 503 if the Groq client is not initialized
+    """
+    groq_client = getattr(request.app.state, "groq_client", None)
+    if groq_client is None:
+        logger.error("Groq client is not initialized")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Groq service is not available"
+        )
+    return groq_client
+
+
 # Pydantic models for request/response validation
-class ChatRequest(BaseModel):
-    """Request model for chat endpoint."""
-    message: str = Field(
-        ..., 
-        min_length=1, 
-        max_length=4000,
-        description="User message to send to the AI chatbot"
-    )
-    model: Optional[str] = Field(
-        default="llama-3.1-8b-instant",
-        description="Groq model to use for the chat"
-    )
-    max_tokens: Optional[int] = Field(
-        default=1024,
-        ge=1,
-        le=4096,
-        description="Maximum number of tokens in the response"
-    )
-    temperature: Optional[float] = Field(
-        default=0.7,
-        ge=0.0,
-        le=2.0,
-        description="Temperature for response randomness (0.0 = deterministic, 2.0 = very random)"
-    )
+def _build_chat_request_model(settings: Settings) -> type:
+    """
+    Build the chat request model with limits and defaults taken from settings.
+    
+    Args:
+        settings (Settings): Application settings
+        
+    Returns:
+        type: ChatRequest model class
+    """
+    class ChatRequest(BaseModel):
+        """Request model for chat endpoint."""
+        model_config = ConfigDict(defer_build=True, protected_namespaces=())
+        
+        message: str = Field(
+            ..., 
+            min_length=1, 
+            max_length=settings.max_message_length,
+            description="User message to send to the AI chatbot"
+        )
+        model: str = Field(
+            default=settings.default_model,
+            description="Groq model to use for the chat"
+        )
+        max_tokens: Optional[int] = Field(
+            default=settings.default_max_tokens,
+            ge=1,
+            le=4096,
+            description="Maximum number of tokens in the response"
+        )
+        temperature: Optional[float] = Field(
+            default=settings.default_temperature,
+            ge=0.0,
+            le=2.0,
+            description="Temperature for response randomness (0.0 = deterministic, 2.0 = very random)"
+        )
+    
+    return ChatRequest
+
+
+ChatRequest = _build_chat_request_model(get_settings())
 
 
 class ChatResponse(BaseModel):
     """Response model for chat endpoint."""
-    model_config = {"protected_namespaces": ()}
+    model_config = ConfigDict(defer_build=True, protected_namespaces=())
     
     reply: str = Field(
         ...,
@@ -124,6 +190,8 @@ class ChatResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
     """Error response model."""
+    model_config = ConfigDict(defer_build=True)
+    
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Detailed error information")
 
@@ -141,57 +209,43 @@ async def root():
 
 
 @app.get("/health", tags=["Health"])
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
+    groq_client = getattr(request.app.state, "groq_client", None)
     return {
         "status": "healthy",
         "groq_client": "connected" if groq_client else "disconnected"
     }
 
 
-@app.post(
-    "/chat",
-    response_model=ChatResponse,
-    responses={
-        400: {"model": ErrorResponse, "description": "Bad Request"},
-        500: {"model": ErrorResponse, "description": "Internal Server Error"},
-        503: {"model": ErrorResponse, "description": "Service Unavailable"}
-    },
-    tags=["Chat"]
-)
-async def chat(request: ChatRequest):
+async def _create_chat_completion(groq_client: AsyncGroq, request: ChatRequest, stream: bool):
     """
-    Main chat endpoint - Send a message to the AI chatbot and get a response.
-    
-    This endpoint accepts a user message and returns an AI-generated response
-    using Groq's LLaMA3 model.
+    Send a chat request to Groq, translating failures into HTTP errors.
     
     Args:
+        groq_client: Groq client to send the request with
         request: ChatRequest containing the user message and optional parameters
+        stream: Whether Groq should stream the completion back in chunks
         
     Returns:
-        ChatResponse: Contains the AI response and metadata
+        The Groq chat completion, or an async stream of chunks when streaming
         
     Raises:
-        HTTPException: For various error conditions (400, 500, 503)
+        HTTPException: For various error conditions (400, 401, 429, 500, 503)
     """
-    if not groq_client:
-        logger.error("Groq client is not initialized")
+    if request.model not in _VALID_MODELS:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Groq service is not available"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown model '{request.model}'"
         )
     
     try:
-        logger.info(f"Processing chat request with model: {request.model}")
+        logger.info("Processing chat request with model: %s", request.model)
         
         # Create chat completion using Groq
-        chat_completion = groq_client.chat.completions.create(
+        return await groq_client.chat.completions.create(
             messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful AI assistant. Provide clear, concise, and helpful responses."
-                },
+                _SYSTEM_MSG,
                 {
                     "role": "user",
                     "content": request.message
@@ -200,86 +254,170 @@ async def chat(request: ChatRequest):
             model=request.model,
             max_tokens=request.max_tokens,
             temperature=request.temperature,
-            stream=False
+            stream=stream
         )
         
+    except AuthenticationError as e:
+        logger.error("Groq authentication failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Groq API key"
+        )
+    except RateLimitError as e:
+        logger.error("Groq rate limit exceeded: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded. Please try again later."
+        )
+    except NotFoundError as e:
+        logger.error("Groq model not found: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Model '{request.model}' is not available"
+        )
+    except APIConnectionError as e:
+        logger.error("Could not reach Groq API: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Groq service is not available"
+        )
+    except Exception as e:
+        # Generic server error, including any other groq.APIError
+        logger.error("Error processing chat request: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while processing your request"
+        )
+
+
+def _sse_event(data: str) -> str:
+    """Format text as a Server-Sent Events message, one data line per line."""
+    return "".join(f"data: {line}\n" for line in _SSE_LINE_BREAK_RE.split(data)) + "\n"
+
+
+@app.post(
+    "/chat",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={
+        200: {"model": ChatResponse, "description": "Successful Response"},
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Service Unavailable"}
+    },
+    tags=["Chat"]
+)
+async def chat(request: ChatRequest, groq_client: AsyncGroq = Depends(get_groq_client)):
+    """
+    Main chat endpoint - Send a message to the AI chatbot and get a response.
+    
+    This endpoint accepts a user message and returns an AI-generated response
+    using Groq's LLaMA3 model.
+    
+    Args:
+        request: ChatRequest containing the user message and optional parameters
+        groq_client: Groq client injected from the application state
+        
+    Returns:
+        ChatResponse: Contains the AI response and metadata
+        
+    Raises:
+        HTTPException: For various error conditions (400, 500, 503)
+    """
+    chat_completion = await _create_chat_completion(groq_client, request, stream=False)
+    
+    try:
         # Extract response
         ai_response = chat_completion.choices[0].message.content
         tokens_used = chat_completion.usage.total_tokens if chat_completion.usage else None
-        
-        logger.info(f"Chat response generated successfully. Tokens used: {tokens_used}")
-        
-        return ChatResponse(
-            reply=ai_response,
-            model_used=request.model,
-            tokens_used=tokens_used
+    except Exception as e:
+        logger.error("Error processing chat request: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while processing your request"
         )
+    
+    # No response model validates the reply anymore, so enforce ChatResponse.reply: str here
+    if ai_response is None:
+        logger.error("Groq returned a completion without message content")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while processing your request"
+        )
+    
+    logger.info("Chat response generated successfully. Tokens used: %s", tokens_used)
+    
+    # Encode directly with orjson, skipping the response model round-trip
+    return ORJSONResponse({
+        "reply": ai_response,
+        "model_used": request.model,
+        "tokens_used": tokens_used
+    })
+
+
+@app.post(
+    "/chat/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Stream of response chunks"},
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Service Unavailable"}
+    },
+    tags=["Chat"]
+)
+async def chat_stream(request: ChatRequest, groq_client: AsyncGroq = Depends(get_groq_client)):
+    """
+    Streaming chat endpoint - Send a message and receive the reply as Server-Sent Events.
+    
+    Each event carries the next piece of the AI response as it is generated.
+    The stream ends with a `[DONE]` event.
+    
+    Args:
+        request: ChatRequest containing the user message and optional parameters
+        groq_client: Groq client injected from the application state
         
-    except Exception as e:
-        logger.error(f"Error processing chat request: {str(e)}")
+    Returns:
+        StreamingResponse: text/event-stream of response chunks
         
-        # Handle specific Groq API errors
-        if "invalid_api_key" in str(e).lower():
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid Groq API key"
-            )
-        elif "rate_limit" in str(e).lower():
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please try again later."
-            )
-        elif "model" in str(e).lower() and "not found" in str(e).lower():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Model '{request.model}' is not available"
-            )
-        else:
-            # Generic server error
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="An error occurred while processing your request"
-            )
-
-
-@app.get("/models", tags=["Models"])
+    Raises:
+        HTTPException: For various error conditions (400, 500, 503)
+    """
+    completion_stream = await _create_chat_completion(groq_client, request, stream=True)
+    
+    async def event_stream():
+        try:
+            async for chunk in completion_stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield _sse_event(delta)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error("Error streaming chat response: %s", e)
+            yield "event: error\n" + _sse_event("An error occurred while processing your request")
+            return
+        finally:
+            # Release the upstream connection even if the client disconnected
+            await completion_stream.close()
+        
+        yield _sse_event("[DONE]")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Keep caches and reverse proxies (e.g. nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/models", tags=["Models"], dependencies=[Depends(get_groq_client)])
 async def get_available_models():
     """Get list of available Groq models."""
-    if not groq_client:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Groq service is not available"
-        )
-    
     try:
-        # Common Groq models (as of 2024)
-        available_models = [
-            {
-                "id": "llama-3.1-8b-instant",
-                "name": "LLaMA3 8B",
-                "description": "Fast and efficient model for general conversations"
-            },
-            {
-                "id": "llama3-70b-8192", 
-                "name": "LLaMA3 70B",
-                "description": "More powerful model for complex tasks"
-            },
-            {
-                "id": "mixtral-8x7b-32768",
-                "name": "Mixtral 8x7B",
-                "description": "High-performance mixture of experts model"
-            },
-            {
-                "id": "gemma-7b-it",
-                "name": "Gemma 7B",
-                "description": "Google's Gemma model for instruction following"
-            }
-        ]
-        
-        return {"models": available_models}
+        return {"models": get_groq_models()}
         
     except Exception as e:
-        logger.error(f"Error fetching models: {str(e)}")
+        logger.error("Error fetching models: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch available models"
@@ -290,23 +428,13 @@ async def get_available_models():
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
     """Handle ValueError exceptions."""
-    logger.error(f"ValueError: {str(exc)}")
+    logger.error("ValueError: %s", exc)
     return JSONResponse(
         status_code=400,
         content={"error": "Invalid input", "detail": str(exc)}
     )
 
 
-@app.exception_handler(Exception)
-async def general_exception_handler(request, exc):
-    """Handle general exceptions."""
-    logger.error(f"Unhandled exception: {str(exc)}")
-    return JSONResponse(
-        status_code=500,
-        content={"error": "Internal server error", "detail": "An unexpected error occurred"}
-    )
-
-
 if __name__ == "__main__":
     import uvicorn
 
@@ -11,11 +11,13 @@ import uvicorn
 from pathlib import Path
 
 # Import from current directory
-from config import settings, validate_settings
+from config import get_settings, validate_settings
 
 
 def main():
     """Main function to start the FastAPI application."""
+    settings = get_settings()
+    
     parser = argparse.ArgumentParser(description="Groq FastAPI Chatbot Server")
     parser.add_argument(
         "--host", 
@@ -33,6 +35,17 @@ def main():
         action="store_true", 
         help="Enable auto-reload for development"
     )
+    parser.add_argument(
+        "--access-log", 
+        action="store_true", 
+        help="Enable per-request access logging"
+    )
+    parser.add_argument(
+        "--workers", 
+        type=int, 
+        default=int(os.getenv("WEB_CONCURRENCY", "1")), 
+        help="Number of worker processes (default: $WEB_CONCURRENCY or 1, ignored with --reload)"
+    )
     parser.add_argument(
         "--log-level", 
         default=settings.log_level.lower(), 
@@ -52,6 +65,10 @@ def main():
     print(f"🚀 Starting Groq FastAPI Chatbot on {args.host}:{args.port}")
     print(f"📚 API Documentation: http://{args.host}:{args.port}/docs")
     print(f"🔄 Auto-reload: {'enabled' if args.reload else 'disabled'}")
+    
+    # Reload and multiple workers are mutually exclusive in uvicorn
+    workers = 1 if args.reload else args.workers
+    print(f"👷 Workers: {workers}")
     print(f"📝 Log level: {args.log_level.upper()}")
     
     # Start the server
@@ -62,7 +79,8 @@ def main():
             port=args.port,
             reload=args.reload,
             log_level=args.log_level,
-            access_log=True
+            workers=workers,
+            access_log=args.access_log
         )
     except KeyboardInterrupt:
         print("\n👋 Shutting down gracefully...")
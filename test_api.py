@@ -4,7 +4,7 @@ Example script to test the Groq FastAPI Chatbot API.
 This script demonstrates how to interact with the API programmatically.
 """
 
-import requests
+import httpx
 import json
 import time
 from typing import Dict, Any
@@ -21,7 +21,7 @@ class ChatbotAPIClient:
             base_url (str): Base URL of the API server
         """
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        self.session = httpx.Client(timeout=60.0)
     
     def health_check(self) -> Dict[str, Any]:
         """Check if the API is healthy."""
@@ -29,7 +29,7 @@ class ChatbotAPIClient:
             response = self.session.get(f"{self.base_url}/health")
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             return {"error": str(e), "status": "unhealthy"}
     
     def get_models(self) -> Dict[str, Any]:
@@ -38,7 +38,7 @@ class ChatbotAPIClient:
             response = self.session.get(f"{self.base_url}/models")
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             return {"error": str(e)}
     
     def chat(self, message: str, model: str = "llama-3.1-8b-instant", 
@@ -70,7 +70,7 @@ class ChatbotAPIClient:
             )
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             return {"error": str(e)}
 
 
@@ -5,13 +5,15 @@ Tests all API endpoints and functionality.
 
 import pytest
 import os
+import httpx
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock
+from groq import RateLimitError
 
 # Set test environment variables before importing the app
 os.environ["GROQ_API_KEY"] = "test_api_key_12345"
 
-from main import app
+from main import app, get_groq_client
 
 
 @pytest.fixture
@@ -20,6 +22,15 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def mock_client():
+    """Override the Groq client dependency with a mock."""
+    mock = Mock()
+    app.dependency_overrides[get_groq_client] = lambda: mock
+    yield mock
+    app.dependency_overrides.clear()
+
+
 @pytest.fixture
 def mock_groq_response():
     """Mock Groq API response."""
@@ -55,7 +66,7 @@ class TestHealthEndpoints:
 class TestModelsEndpoint:
     """Test models endpoint."""
     
-    def test_get_available_models(self, client):
+    def test_get_available_models(self, client, mock_client):
         """Test getting available models."""
         response = client.get("/models")
         assert response.status_code == 200
@@ -73,11 +84,10 @@ class TestModelsEndpoint:
 class TestChatEndpoint:
     """Test chat endpoint functionality."""
     
-    @patch('app.main.groq_client')
-    def test_chat_success(self, mock_client, client, mock_groq_response):
+    def test_chat_success(self, client, mock_client, mock_groq_response):
         """Test successful chat interaction."""
         # Setup mock
-        mock_client.chat.completions.create.return_value = mock_groq_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_groq_response)
         
         # Test request
         response = client.post(
@@ -91,11 +101,10 @@ class TestChatEndpoint:
         assert data["model_used"] == "llama-3.1-8b-instant"
         assert data["tokens_used"] == 25
     
-    @patch('app.main.groq_client')
-    def test_chat_with_custom_parameters(self, mock_client, client, mock_groq_response):
+    def test_chat_with_custom_parameters(self, client, mock_client, mock_groq_response):
         """Test chat with custom parameters."""
         # Setup mock
-        mock_client.chat.completions.create.return_value = mock_groq_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_groq_response)
         
         # Test request with custom parameters
         response = client.post(
@@ -119,7 +128,80 @@ class TestChatEndpoint:
         assert call_args[1]["max_tokens"] == 512
         assert call_args[1]["temperature"] == 0.9
     
-    def test_chat_empty_message(self, client):
+    def test_chat_unknown_model(self, client, mock_client):
+        """Test chat rejects unknown models without calling Groq."""
+        mock_client.chat.completions.create = AsyncMock()
+        
+        response = client.post(
+            "/chat",
+            json={"message": "Hello", "model": "gpt-4"}
+        )
+        
+        assert response.status_code == 400
+        assert "gpt-4" in response.json()["detail"]
+        mock_client.chat.completions.create.assert_not_called()
+    
+    def test_chat_stream(self, client, mock_client):
+        """Test streaming chat returns Server-Sent Events and closes the upstream stream."""
+        chunks = []
+        for text in ("Hello", " there!\rBye"):
+            chunk = Mock()
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = text
+            chunks.append(chunk)
+        
+        async def iterate_chunks():
+            for chunk in chunks:
+                yield chunk
+        
+        completion_stream = Mock()
+        completion_stream.__aiter__ = lambda self: iterate_chunks()
+        completion_stream.close = AsyncMock()
+        mock_client.chat.completions.create = AsyncMock(return_value=completion_stream)
+        
+        response = client.post(
+            "/chat/stream",
+            json={"message": "Hello AI!"}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.headers["x-accel-buffering"] == "no"
+        assert response.text == "data: Hello\n\ndata:  there!\ndata: Bye\n\ndata: [DONE]\n\n"
+        assert mock_client.chat.completions.create.call_args[1]["stream"] is True
+        completion_stream.close.assert_awaited_once()
+    
+    def test_chat_stream_upstream_error(self, client, mock_client):
+        """Test a mid-stream Groq failure is reported in-band and the stream is closed."""
+        async def failing_chunks():
+            raise RuntimeError("connection reset")
+            yield  # pragma: no cover - makes this an async generator
+        
+        completion_stream = Mock()
+        completion_stream.__aiter__ = lambda self: failing_chunks()
+        completion_stream.close = AsyncMock()
+        mock_client.chat.completions.create = AsyncMock(return_value=completion_stream)
+        
+        response = client.post(
+            "/chat/stream",
+            json={"message": "Hello AI!"}
+        )
+        
+        assert response.status_code == 200
+        assert response.text.startswith("event: error\n")
+        assert "[DONE]" not in response.text
+        completion_stream.close.assert_awaited_once()
+    
+    def test_chat_null_model(self, client, mock_client):
+        """Test chat rejects an explicit null model with a validation error."""
+        response = client.post(
+            "/chat",
+            json={"message": "Hello", "model": None}
+        )
+        assert response.status_code == 422  # Validation error
+    
+    def test_chat_empty_message(self, client, mock_client):
         """Test chat with empty message."""
         response = client.post(
             "/chat",
@@ -127,7 +209,7 @@ class TestChatEndpoint:
         )
         assert response.status_code == 422  # Validation error
     
-    def test_chat_message_too_long(self, client):
+    def test_chat_message_too_long(self, client, mock_client):
         """Test chat with message that's too long."""
         long_message = "x" * 5000  # Exceeds max length
         response = client.post(
@@ -136,7 +218,7 @@ class TestChatEndpoint:
         )
         assert response.status_code == 422  # Validation error
     
-    def test_chat_invalid_temperature(self, client):
+    def test_chat_invalid_temperature(self, client, mock_client):
         """Test chat with invalid temperature."""
         response = client.post(
             "/chat",
@@ -147,7 +229,7 @@ class TestChatEndpoint:
         )
         assert response.status_code == 422  # Validation error
     
-    def test_chat_invalid_max_tokens(self, client):
+    def test_chat_invalid_max_tokens(self, client, mock_client):
         """Test chat with invalid max_tokens."""
         response = client.post(
             "/chat",
@@ -158,11 +240,10 @@ class TestChatEndpoint:
         )
         assert response.status_code == 422  # Validation error
     
-    @patch('app.main.groq_client')
-    def test_chat_groq_api_error(self, mock_client, client):
+    def test_chat_groq_api_error(self, client, mock_client):
         """Test chat when Groq API returns an error."""
         # Setup mock to raise an exception
-        mock_client.chat.completions.create.side_effect = Exception("API Error")
+        mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
         
         response = client.post(
             "/chat",
@@ -173,7 +254,36 @@ class TestChatEndpoint:
         data = response.json()
         assert "error" in data["detail"] or "error" in str(data)
     
-    @patch('app.main.groq_client', None)
+    def test_chat_groq_empty_content(self, client, mock_client, mock_groq_response):
+        """Test chat when Groq returns a completion without message content."""
+        mock_groq_response.choices[0].message.content = None
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_groq_response)
+        
+        response = client.post(
+            "/chat",
+            json={"message": "Hello"}
+        )
+        
+        assert response.status_code == 500
+    
+    def test_chat_groq_rate_limited(self, client, mock_client):
+        """Test chat when Groq API rejects the request with a rate limit."""
+        groq_response = httpx.Response(
+            429, request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+        )
+        mock_client.chat.completions.create = AsyncMock(
+            side_effect=RateLimitError("Rate limit reached", response=groq_response, body=None)
+        )
+        
+        response = client.post(
+            "/chat",
+            json={"message": "Hello"}
+        )
+        
+        assert response.status_code == 429
+        assert "rate limit" in response.json()["detail"].lower()
+        mock_client.chat.completions.create.assert_awaited_once()
+    
     def test_chat_no_groq_client(self, client):
         """Test chat when Groq client is not available."""
         response = client.post(
@@ -215,7 +325,7 @@ class TestCORSHeaders:
 class TestRequestValidation:
     """Test request validation and error handling."""
     
-    def test_invalid_json(self, client):
+    def test_invalid_json(self, client, mock_client):
         """Test request with invalid JSON."""
         response = client.post(
             "/chat",
@@ -224,7 +334,7 @@ class TestRequestValidation:
         )
         assert response.status_code == 422
     
-    def test_missing_message_field(self, client):
+    def test_missing_message_field(self, client, mock_client):
         """Test request missing required message field."""
         response = client.post(
             "/chat",
@@ -232,7 +342,7 @@ class TestRequestValidation:
         )
         assert response.status_code == 422
     
-    def test_wrong_content_type(self, client):
+    def test_wrong_content_type(self, client, mock_client):
         """Test request with wrong content type."""
         response = client.post(
             "/chat",
@@ -5,19 +5,28 @@ Tests all helper functions in the utils module.
 
 import pytest
 from datetime import datetime
-from unittest.mock import Mock
 
+from config import get_settings
 from utils import (
     sanitize_message,
     format_chat_response,
     validate_model_name,
     estimate_tokens,
+    estimate_tokens_batch,
     create_system_prompt,
     create_error_response,
     health_check_groq_client
 )
 
 
+class Mock:
+    """Minimal stand-in for unittest.mock.Mock, avoiding its import cost."""
+    side_effect = None
+    
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
 class TestSanitizeMessage:
     """Test message sanitization functionality."""
     
@@ -47,7 +56,12 @@ class TestSanitizeMessage:
         """Test removing script tags."""
         message = "Hello <script>alert('xss')</script> world"
         result = sanitize_message(message)
-        assert result == "Hello  world"
+        assert result == "Hello world"
+    
+    def test_sanitize_script_tags_unicode_case_folding(self):
+        """Test removing script tags spelled with Unicode case variants."""
+        assert sanitize_message("a <scr\u0131pt>x</scr\u0131pt> b") == "a b"
+        assert sanitize_message("a <SCR\u0130PT>x</SCR\u0130PT> b") == "a b"
     
     def test_sanitize_html_tags(self):
         """Test removing HTML tags."""
@@ -70,25 +84,25 @@ class TestFormatChatResponse:
         """Test formatting a basic response."""
         result = format_chat_response("Hello!", "llama-3.1-8b-instant", 25)
         
-        assert result["reply"] == "Hello!"
-        assert result["model_used"] == "llama-3.1-8b-instant"
-        assert result["tokens_used"] == 25
-        assert result["status"] == "success"
-        assert "timestamp" in result
+        assert result.reply == "Hello!"
+        assert result.model_used == "llama-3.1-8b-instant"
+        assert result.tokens_used == 25
+        assert result.status == "success"
+        assert isinstance(result.timestamp, float)
     
     def test_format_response_no_tokens(self):
         """Test formatting response without token count."""
         result = format_chat_response("Hello!", "llama-3.1-8b-instant")
         
-        assert result["reply"] == "Hello!"
-        assert result["model_used"] == "llama-3.1-8b-instant"
-        assert result["tokens_used"] is None
-        assert result["status"] == "success"
+        assert result.reply == "Hello!"
+        assert result.model_used == "llama-3.1-8b-instant"
+        assert result.tokens_used is None
+        assert result.status == "success"
     
     def test_format_response_strips_whitespace(self):
         """Test that response strips whitespace."""
         result = format_chat_response("  Hello!  \n", "llama-3.1-8b-instant")
-        assert result["reply"] == "Hello!"
+        assert result.reply == "Hello!"
 
 
 class TestValidateModelName:
@@ -106,6 +120,10 @@ class TestValidateModelName:
         for model in valid_models:
             assert validate_model_name(model) is True
     
+    def test_configured_default_model_is_valid(self):
+        """Test the configured default model is accepted like the API does."""
+        assert validate_model_name(get_settings().default_model) is True
+    
     def test_invalid_models(self):
         """Test validation of invalid model names."""
         invalid_models = [
@@ -140,6 +158,12 @@ class TestEstimateTokens:
         result = estimate_tokens(text)
         expected = len(text) // 4
         assert result == expected
+    
+    def test_estimate_batch_matches_single(self):
+        """Test batch token estimation matches per-text estimation."""
+        texts = ["", "Hello world", "This is a longer text that should have more tokens estimated."]
+        result = estimate_tokens_batch(texts)
+        assert result == [estimate_tokens(text) for text in texts]
 
 
 class TestCreateSystemPrompt:
@@ -204,6 +228,15 @@ class TestHealthCheckGroqClient:
         assert "connected and ready" in result["message"]
         assert "timestamp" in result
     
+    def test_health_check_cached_within_ttl(self):
+        """Test repeated health checks for the same client reuse the result."""
+        mock_client = Mock()
+        first = health_check_groq_client(mock_client)
+        second = health_check_groq_client(mock_client)
+        
+        assert second is first
+        assert health_check_groq_client(mock_client, ttl=0) is not first
+    
     def test_health_check_client_exception(self):
         """Test health check when client raises exception."""
         mock_client = Mock()
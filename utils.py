@@ -4,12 +4,59 @@ Contains helper functions for message processing, validation, and formatting.
 """
 
 import re
+import sys
+import time
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional
+
+from config import get_valid_model_ids
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns for sanitize_message
+_SCRIPT_RE = re.compile(r'<script.*?</script>', re.IGNORECASE | re.DOTALL)
+_SCRIPT_OPEN_RE = re.compile(r'<script', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Default system prompt for the AI model
+_BASE_SYSTEM_PROMPT = (
+    "You are a helpful AI assistant. Provide clear, concise, and helpful responses. "
+    "Be friendly and professional in your interactions. If you're unsure about something, "
+    "acknowledge the uncertainty rather than guessing."
+)
+
+# Interned status/message constants shared by every response dict
+_SUCCESS = sys.intern("success")
+_HEALTHY = sys.intern("healthy")
+_UNHEALTHY = sys.intern("unhealthy")
+_HEALTHY_MSG = sys.intern("Groq client is connected and ready")
+_UNHEALTHY_INIT_MSG = sys.intern("Groq client is not initialized")
+
+# Key layout for create_error_response, copied per call
+_ERROR_TEMPLATE: Dict[str, Any] = {"error": None, "message": None, "status_code": 500, "timestamp": None}
+
+# Last health check result, reused for a short TTL
+_health_cache: Dict[str, Any] = {"checked_at": 0.0, "client": None, "result": None}
+
+
+def _now(_time=time.time) -> float:
+    """Return the current time as seconds since the Unix epoch."""
+    return _time()
+
+
+def _collapse_ws_and_truncate(message: str) -> str:
+    """Collapse runs of whitespace and enforce the message length limit."""
+    # Remove excessive whitespace (split() drops leading/trailing runs too)
+    message = ' '.join(message.split())
+    
+    # Limit message length (additional safety check)
+    if len(message) > 4000:
+        message = f"{message[:4000]}..."
+        logger.warning("Message truncated due to length limit")
+    
+    return message
+
 
 def sanitize_message(message: str) -> str:
     """
@@ -24,24 +71,32 @@ def sanitize_message(message: str) -> str:
     if not message:
         return ""
     
-    # Remove excessive whitespace
-    message = re.sub(r'\s+', ' ', message.strip())
+    # Plain-text messages cannot contain tags, so skip the regex engine
+    if '<' not in message:
+        return _collapse_ws_and_truncate(message)
     
-    # Remove potential script tags (basic XSS protection)
-    message = re.sub(r'<script.*?</script>', '', message, flags=re.IGNORECASE | re.DOTALL)
+    # Remove potential script tags (basic XSS protection), only if one can match.
+    # Uses the same case-insensitive matching as _SCRIPT_RE (e.g. dotless "ı").
+    if _SCRIPT_OPEN_RE.search(message):
+        message = _SCRIPT_RE.sub('', message)
     
     # Remove HTML tags
-    message = re.sub(r'<[^>]+>', '', message)
+    if '<' in message:
+        message = _TAG_RE.sub('', message)
     
-    # Limit message length (additional safety check)
-    if len(message) > 4000:
-        message = message[:4000] + "..."
-        logger.warning("Message truncated due to length limit")
-    
-    return message
+    return _collapse_ws_and_truncate(message)
 
 
-def format_chat_response(response: str, model: str, tokens: Optional[int] = None) -> Dict[str, Any]:
+class ChatResult(NamedTuple):
+    """Formatted chat response with metadata."""
+    reply: str
+    model_used: str
+    tokens_used: Optional[int]
+    timestamp: float
+    status: str
+
+
+def format_chat_response(response: str, model: str, tokens: Optional[int] = None) -> ChatResult:
     """
     Format the chat response with metadata.
     
@@ -51,15 +106,9 @@ def format_chat_response(response: str, model: str, tokens: Optional[int] = None
         tokens (Optional[int]): Number of tokens used
         
     Returns:
-        Dict[str, Any]: Formatted response with metadata
+        ChatResult: Formatted response with metadata (use ._asdict() for a dict)
     """
-    return {
-        "reply": response.strip(),
-        "model_used": model,
-        "tokens_used": tokens,
-        "timestamp": datetime.utcnow().isoformat(),
-        "status": "success"
-    }
+    return ChatResult(response.strip(), model, tokens, _now(), _SUCCESS)
 
 
 def validate_model_name(model: str) -> bool:
@@ -72,14 +121,7 @@ def validate_model_name(model: str) -> bool:
     Returns:
         bool: True if model is valid, False otherwise
     """
-    valid_models = [
-        "llama-3.1-8b-instant",
-        "llama3-70b-8192", 
-        "mixtral-8x7b-32768",
-        "gemma-7b-it"
-    ]
-    
-    return model in valid_models
+    return isinstance(model, str) and model in get_valid_model_ids()
 
 
 def estimate_tokens(text: str) -> int:
@@ -94,9 +136,24 @@ def estimate_tokens(text: str) -> int:
         int: Estimated token count
     """
     # Rough approximation: 1 token ≈ 4 characters for English text
-    return len(text) // 4
+    return len(text) >> 2
+
+
+def estimate_tokens_batch(texts: Iterable[str]) -> List[int]:
+    """
+    Rough estimation of token counts for many texts at once.
+    Uses the same approximation as estimate_tokens.
+    
+    Args:
+        texts (Iterable[str]): Texts to estimate tokens for
+        
+    Returns:
+        List[int]: Estimated token count for each text, in order
+    """
+    return [length >> 2 for length in map(len, texts)]
 
 
+@lru_cache(maxsize=128)
 def create_system_prompt(custom_instructions: Optional[str] = None) -> str:
     """
     Create a system prompt for the AI model.
@@ -107,16 +164,10 @@ def create_system_prompt(custom_instructions: Optional[str] = None) -> str:
     Returns:
         str: Complete system prompt
     """
-    base_prompt = (
-        "You are a helpful AI assistant. Provide clear, concise, and helpful responses. "
-        "Be friendly and professional in your interactions. If you're unsure about something, "
-        "acknowledge the uncertainty rather than guessing."
-    )
-    
-    if custom_instructions:
-        base_prompt += f"\n\nAdditional instructions: {custom_instructions}"
+    if not custom_instructions:
+        return _BASE_SYSTEM_PROMPT
     
-    return base_prompt
+    return f"{_BASE_SYSTEM_PROMPT}\n\nAdditional instructions: {custom_instructions}"
 
 
 def log_chat_interaction(user_message: str, ai_response: str, model: str, tokens: Optional[int] = None):
@@ -129,11 +180,15 @@ def log_chat_interaction(user_message: str, ai_response: str, model: str, tokens
         model (str): Model used
         tokens (Optional[int]): Tokens consumed
     """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     logger.info(
-        f"Chat interaction - Model: {model}, "
-        f"User message length: {len(user_message)}, "
-        f"Response length: {len(ai_response)}, "
-        f"Tokens used: {tokens or 'unknown'}"
+        "Chat interaction - Model: %s, User message length: %d, Response length: %d, Tokens used: %s",
+        model,
+        len(user_message),
+        len(ai_response),
+        tokens if tokens is not None else 'unknown'
     )
 
 
@@ -149,45 +204,56 @@ def create_error_response(error_type: str, message: str, status_code: int = 500)
     Returns:
         Dict[str, Any]: Formatted error response
     """
-    return {
-        "error": error_type,
-        "message": message,
-        "status_code": status_code,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    response = _ERROR_TEMPLATE.copy()
+    response["error"] = error_type
+    response["message"] = message
+    response["status_code"] = status_code
+    response["timestamp"] = _now()
+    return response
 
 
-def health_check_groq_client(groq_client) -> Dict[str, Any]:
+def health_check_groq_client(groq_client, ttl: float = 1.0) -> Dict[str, Any]:
     """
     Perform a health check on the Groq client.
     
+    Results are cached per client for `ttl` seconds so that frequent
+    liveness/readiness probes reuse the previous result.
+    
     Args:
         groq_client: Groq client instance
+        ttl (float): Seconds a cached result stays valid
         
     Returns:
-        Dict[str, Any]: Health check results
+        Dict[str, Any]: Health check results (shared while cached; do not mutate)
     """
+    now = time.monotonic()
+    cached = _health_cache["result"]
+    if cached is not None and groq_client is _health_cache["client"] and now - _health_cache["checked_at"] < ttl:
+        return cached
+    
     try:
         if not groq_client:
-            return {
-                "status": "unhealthy",
-                "message": "Groq client is not initialized",
-                "timestamp": datetime.utcnow().isoformat()
+            result = {
+                "status": _UNHEALTHY,
+                "message": _UNHEALTHY_INIT_MSG,
+                "timestamp": _now()
+            }
+        else:
+            # Try a simple API call to test connectivity
+            # Note: This is a basic check - in production you might want a more sophisticated test
+            result = {
+                "status": _HEALTHY,
+                "message": _HEALTHY_MSG,
+                "timestamp": _now()
             }
-        
-        # Try a simple API call to test connectivity
-        # Note: This is a basic check - in production you might want a more sophisticated test
-        return {
-            "status": "healthy",
-            "message": "Groq client is connected and ready",
-            "timestamp": datetime.utcnow().isoformat()
-        }
         
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return {
-            "status": "unhealthy",
+        logger.error("Health check failed: %s", e)
+        result = {
+            "status": _UNHEALTHY,
             "message": f"Groq client health check failed: {str(e)}",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _now()
         }
-
+    
+    _health_cache.update(checked_at=now, client=groq_client, result=result)
+    return result